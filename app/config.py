@@ -1,6 +1,7 @@
 import os
-from typing import Optional
-from pydantic import BaseSettings, validator
+from typing import List, Optional
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -22,26 +23,31 @@ class Settings(BaseSettings):
     
     # Concurrency Settings
     semaphore_limit: int = 5
-    max_retries: int = 3
+    max_retries: int = Field(default=3, ge=1)
     retry_delay: float = 1.0
     
     # Application Settings
     app_host: str = "0.0.0.0"
     app_port: int = 8000
+    # Read from WEB_CONCURRENCY, the same variable gunicorn uses in the container.
+    # Each worker runs its own Gemini warmup and build_indices at startup.
+    app_workers: int = Field(default=2, ge=1, validation_alias="web_concurrency")
     debug: bool = False
+    health_check_interval: float = 30.0
+    health_probe_timeout: float = 5.0
+    cors_origins: List[str] = []
     
     # Feature Flags
     use_parallel_runtime: bool = False
     graphiti_telemetry_enabled: bool = False
     
-    @validator('google_api_key', 'openai_api_key', 'neo4j_password')
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
+    
+    @field_validator('google_api_key', 'openai_api_key', 'neo4j_password', mode="after")
+    @classmethod
     def validate_required_keys(cls, v):
         if not v:
             raise ValueError('Required API key or password is missing')
         return v
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
 
 settings = Settings()
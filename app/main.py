@@ -1,140 +1,222 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 import asyncio
+import operator
+import orjson
 import structlog
+from async_lru import alru_cache
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pydantic import TypeAdapter
 
 from app.config import settings
 from app.models import (
-    EpisodeRequest, EpisodeResponse, 
+    EpisodeRequest, EpisodeBatchRequest, EpisodeResponse,
     SearchRequest, SearchResponse,
     HealthResponse, StatsResponse
 )
-from app.utils import get_manager
+from app.utils import GraphitiGeminiManager, get_manager
 
 logger = structlog.get_logger()
 
+# Same options ORJSONResponse renders with, for payloads encoded ahead of time
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Search results are serialized in a single pydantic-core pass
+_RESULTS_ADAPTER = TypeAdapter(List[Dict[str, Any]])
+
+@lru_cache(maxsize=None)
+def _result_converter(result_type: type) -> Callable[[Any], Any]:
+    """Resolve the serializer for a search result class once per class"""
+    if hasattr(result_type, 'to_dict'):
+        return operator.methodcaller('to_dict')
+    # Keep the payload consistent with SearchResponse.results (a list of dicts)
+    return lambda result: {"value": str(result)}
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management"""
     try:
         # Startup
-        logger.info("Starting Graphiti-Gemini application...")
+        logger.info("application_starting")
         manager = get_manager()
+        # Resolved once here so endpoints read it straight from app.state
+        app.state.manager = manager
         await manager.initialize_graphiti()
-        logger.info("Application started successfully")
+        await manager.warmup()
+        # FastAPI memoizes the schema; build it now instead of on the first /docs hit
+        app.openapi()
+        logger.info("application_started")
         yield
     except Exception as e:
-        logger.error(f"Failed to start application: {e}")
+        logger.exception("application_start_failed", error=str(e))
         raise
     finally:
         # Shutdown
-        logger.info("Shutting down application...")
+        logger.info("application_shutting_down")
+        # Only close a manager that was actually built; calling get_manager()
+        # here would re-run a failed constructor and mask the original error
+        manager = getattr(app.state, "manager", None)
+        if manager is not None:
+            await manager.close()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Graphiti with Gemini API",
     description="Knowledge graph API using Graphiti with Google Gemini LLM",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Add CORS middleware only when cross-origin clients are configured
+if settings.cors_origins:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["GET", "POST"],
+        allow_headers=["content-type", "authorization"],
+    )
+
+@app.get("/livez")
+async def liveness_check():
+    """Liveness probe, answered without any external calls"""
+    return {"status": "alive"}
 
 @app.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Health check endpoint"""
+async def health_check(request: Request):
+    """Health check endpoint backed by a cached deep probe"""
     try:
-        manager = get_manager()
+        manager = request.app.state.manager
         services_status = await manager.health_check()
         
         overall_status = "healthy" if all(
             status == "healthy" for status in services_status.values()
         ) else "unhealthy"
         
-        return HealthResponse(
+        return HealthResponse.model_construct(
             status=overall_status,
             services=services_status
         )
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        logger.exception("health_check_failed", error=str(e))
         raise HTTPException(status_code=500, detail="Health check failed")
 
+@app.get("/readyz", response_model=HealthResponse)
+async def readiness_check(request: Request, response: Response):
+    """Readiness probe; answers 503 while any service is unhealthy"""
+    health = await health_check(request)
+    if health.status != "healthy":
+        response.status_code = 503
+    return health
+
 @app.post("/episodes", response_model=EpisodeResponse)
-async def add_episode(episode: EpisodeRequest):
+async def add_episode(episode: EpisodeRequest, request: Request):
     """Add a new episode to the knowledge graph"""
     try:
-        manager = get_manager()
-        graphiti = await manager.get_graphiti()
+        manager = request.app.state.manager
         
-        await graphiti.add_episode(
+        await manager.add_episode(
             name=episode.name,
             episode_body=episode.episode_body,
             source_description=episode.source_description,
             reference_time=episode.reference_time
         )
         
-        logger.info(f"Episode '{episode.name}' added successfully")
+        logger.info("episode_added", name=episode.name)
+        _cached_search.cache_clear()
         
-        return EpisodeResponse(
+        return EpisodeResponse.model_construct(
             success=True,
             message="Episode added successfully",
             episode_name=episode.name
         )
         
     except Exception as e:
-        logger.error(f"Failed to add episode: {e}")
+        logger.exception("add_episode_failed", error=str(e))
         raise HTTPException(
             status_code=500, 
             detail=f"Failed to add episode: {str(e)}"
         )
 
-@app.post("/search", response_model=SearchResponse)
-async def search_graph(search: SearchRequest):
-    """Search the knowledge graph"""
+@app.post("/episodes/batch", response_model=List[EpisodeResponse])
+async def add_episodes_batch(batch: EpisodeBatchRequest, request: Request):
+    """Add several episodes to the knowledge graph in a single bulk call"""
     try:
-        manager = get_manager()
-        graphiti = await manager.get_graphiti()
+        manager = request.app.state.manager
         
-        # Perform search
-        if search.center_node_uuid:
-            results = await graphiti.search(
-                query=search.query,
-                center_node_uuid=search.center_node_uuid,
-                limit=search.limit
-            )
-        else:
-            results = await graphiti.search(
-                query=search.query,
-                limit=search.limit
-            )
+        await manager.add_episode_bulk([episode.model_dump() for episode in batch.episodes])
         
-        # Convert results to serializable format
-        serializable_results = []
-        for result in results:
-            if hasattr(result, 'to_dict'):
-                serializable_results.append(result.to_dict())
-            else:
-                serializable_results.append(str(result))
+        logger.info("episode_batch_added", count=len(batch.episodes))
+        _cached_search.cache_clear()
         
-        logger.info(f"Search completed: {len(results)} results for query '{search.query}'")
+        return [
+            EpisodeResponse.model_construct(
+                success=True,
+                message="Episode added successfully",
+                episode_name=episode.name
+            )
+            for episode in batch.episodes
+        ]
         
-        return SearchResponse(
-            results=serializable_results,
-            total_count=len(results),
-            query=search.query
+    except Exception as e:
+        logger.exception("add_episode_batch_failed", count=len(batch.episodes), error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to add episodes: {str(e)}"
+        )
+
+# The cache lives in each worker process: cache_clear() after a write only
+# affects the worker that handled it, so other workers may serve results up
+# to the 60s TTL old. The manager argument is a per-process singleton hashed
+# by identity, so it does not fragment the cache.
+@alru_cache(maxsize=1024, ttl=60)
+async def _cached_search(
+    manager: GraphitiGeminiManager,
+    query: str,
+    limit: int,
+    center_node_uuid: Optional[str]
+) -> Tuple[bytes, int]:
+    """Run a search and return the pre-serialized SearchResponse payload and its result count"""
+    # Perform search
+    search_kwargs = {"query": query, "limit": limit}
+    if center_node_uuid is not None:
+        search_kwargs["center_node_uuid"] = center_node_uuid
+    results = await manager.search(**search_kwargs)
+    
+    # Convert results to serializable format
+    serializable_results = _RESULTS_ADAPTER.dump_python(
+        [_result_converter(type(result))(result) for result in results]
+    )
+    
+    response = SearchResponse.model_construct(
+        results=serializable_results,
+        total_count=len(results),
+        query=query
+    )
+    return orjson.dumps(response.model_dump(), option=_ORJSON_OPTIONS), len(results)
+
+@app.post("/search", response_model=SearchResponse, response_class=ORJSONResponse)
+async def search_graph(search: SearchRequest, request: Request):
+    """Search the knowledge graph"""
+    try:
+        payload, total_count = await _cached_search(
+            request.app.state.manager,
+            search.query,
+            search.limit,
+            search.center_node_uuid
         )
         
+        logger.info("search_completed", query=search.query, count=total_count)
+        
+        # Returning the response directly skips FastAPI's response_model re-validation
+        return Response(content=payload, media_type=ORJSONResponse.media_type)
+        
     except Exception as e:
-        logger.error(f"Search failed: {e}")
+        logger.exception("search_failed", error=str(e))
         raise HTTPException(
             status_code=500,
             detail=f"Search failed: {str(e)}"
@@ -144,9 +226,6 @@ async def search_graph(search: SearchRequest):
 async def get_graph_stats():
     """Get knowledge graph statistics"""
     try:
-        manager = get_manager()
-        graphiti = await manager.get_graphiti()
-        
         # Get basic statistics (implement based on Graphiti's available methods)
         # This is a placeholder - adjust based on actual Graphiti API
         stats = {
@@ -156,10 +235,10 @@ async def get_graph_stats():
             "graph_status": "active"
         }
         
-        return StatsResponse(**stats)
+        return StatsResponse.model_construct(**stats)
         
     except Exception as e:
-        logger.error(f"Failed to get stats: {e}")
+        logger.exception("get_stats_failed", error=str(e))
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get statistics: {str(e)}"
@@ -174,7 +253,10 @@ async def root():
         "status": "running",
         "endpoints": {
             "health": "/health",
+            "liveness": "/livez",
+            "readiness": "/readyz",
             "add_episode": "/episodes",
+            "add_episodes_batch": "/episodes/batch",
             "search": "/search",
             "stats": "/stats"
         }
@@ -183,8 +265,11 @@ async def root():
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
-        app,
+        "app.main:app",
         host=settings.app_host,
         port=settings.app_port,
+        loop="uvloop",
+        http="httptools",
+        workers=settings.app_workers,
         log_config=None  # Use structlog instead
     )
@@ -1,13 +1,34 @@
+from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+# Response models are immutable, server-built records
+_RESPONSE_MODEL_CONFIG = ConfigDict(frozen=True, extra='forbid')
 
 class EpisodeRequest(BaseModel):
     name: str = Field(..., description="Episode name/identifier")
     episode_body: str = Field(..., description="Episode content")
     source_description: Optional[str] = Field(None, description="Source description")
-    reference_time: Optional[str] = Field(None, description="Reference timestamp")
+    reference_time: Optional[datetime] = Field(
+        None, validate_default=True, description="Reference timestamp (ISO 8601)"
+    )
+    
+    @field_validator('reference_time', mode="after")
+    @classmethod
+    def normalize_reference_time(cls, v):
+        # Missing means now; naive timestamps are taken as UTC
+        if v is None:
+            return datetime.now(timezone.utc)
+        if v.tzinfo is None:
+            return v.replace(tzinfo=timezone.utc)
+        return v
+
+class EpisodeBatchRequest(BaseModel):
+    episodes: List[EpisodeRequest] = Field(..., min_length=1, max_length=100, description="Episodes to add")
 
 class EpisodeResponse(BaseModel):
+    model_config = _RESPONSE_MODEL_CONFIG
+    
     success: bool
     message: str
     episode_name: str
@@ -18,16 +39,22 @@ class SearchRequest(BaseModel):
     center_node_uuid: Optional[str] = Field(None, description="Center node for reranking")
 
 class SearchResponse(BaseModel):
+    model_config = _RESPONSE_MODEL_CONFIG
+    
     results: List[Dict[str, Any]]
     total_count: int
     query: str
 
 class HealthResponse(BaseModel):
+    model_config = _RESPONSE_MODEL_CONFIG
+    
     status: str
     services: Dict[str, str]
     version: str = "1.0.0"
 
 class StatsResponse(BaseModel):
+    model_config = _RESPONSE_MODEL_CONFIG
+    
     nodes_count: int
     edges_count: int
     episodes_count: int
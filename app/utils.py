@@ -1,78 +1,104 @@
 import asyncio
+import functools
+import logging
+import orjson
 import structlog
-from tenacity import retry, stop_after_attempt, wait_exponential
+import time
 from typing import Any, Optional
-import google.generativeai as genai
-from graphiti import LLMConfig
 
 logger = structlog.get_logger()
 
+# google.generativeai is imported lazily in _setup_gemini to keep cold start fast
+_genai = None
+
 class GraphitiGeminiManager:
     def __init__(self, settings):
         self.settings = settings
         self._graphiti = None
+        # Bounds in-flight Gemini/Neo4j work across all requests
+        self._sem = asyncio.Semaphore(settings.semaphore_limit)
+        # (monotonic timestamp, status) of the last deep health probe
+        self._last_health: Optional[tuple[float, dict]] = None
+        # Lets a single caller run the deep probe when the cached one expires
+        self._health_lock = asyncio.Lock()
         self._setup_logging()
         self._setup_gemini()
     
     def _setup_logging(self):
+        level = logging.DEBUG if self.settings.debug else logging.INFO
         structlog.configure(
             processors=[
-                structlog.stdlib.filter_by_level,
-                structlog.stdlib.add_logger_name,
-                structlog.stdlib.add_log_level,
-                structlog.stdlib.PositionalArgumentsFormatter(),
-                structlog.processors.TimeStamper(fmt="iso"),
-                structlog.processors.StackInfoRenderer(),
+                structlog.processors.add_log_level,
+                structlog.processors.TimeStamper(fmt="iso", utc=True),
                 structlog.processors.format_exc_info,
-                structlog.processors.JSONRenderer()
+                structlog.processors.JSONRenderer(serializer=orjson.dumps)
             ],
             context_class=dict,
-            logger_factory=structlog.stdlib.LoggerFactory(),
-            wrapper_class=structlog.stdlib.BoundLogger,
+            logger_factory=structlog.BytesLoggerFactory(),
+            # Filtered levels are short-circuited before any processor runs
+            wrapper_class=structlog.make_filtering_bound_logger(level),
             cache_logger_on_first_use=True,
         )
     
     def _setup_gemini(self):
         """Configure Gemini API"""
-        genai.configure(api_key=self.settings.google_api_key)
+        global _genai
+        if _genai is None:
+            import google.generativeai as genai
+            _genai = genai
+        _genai.configure(api_key=self.settings.google_api_key)
+        # Warmup model; the 1-token cap keeps the startup call cheap
+        self._gemini_model = _genai.GenerativeModel(
+            self.settings.gemini_model,
+            generation_config={"max_output_tokens": 1}
+        )
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10)
-    )
     async def initialize_graphiti(self):
         """Initialize Graphiti with Gemini configuration"""
         if self._graphiti is not None:
             return self._graphiti
         
-        try:
-            from graphiti import Graphiti
-            
-            # Configure LLM for Gemini
-            llm_config = LLMConfig(
-                provider="gemini",
-                model=self.settings.gemini_model,
-                temperature=self.settings.gemini_temperature,
-                max_tokens=self.settings.gemini_max_tokens,
-            )
-            
-            # Initialize Graphiti
-            self._graphiti = Graphiti(
-                neo4j_uri=self.settings.neo4j_uri,
-                neo4j_user=self.settings.neo4j_user,
-                neo4j_password=self.settings.neo4j_password,
-                llm_config=llm_config
-            )
-            
-            # Build indices
-            await self._graphiti.build_indices()
-            
-            logger.info("Graphiti initialized successfully with Gemini")
-            return self._graphiti
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize Graphiti: {str(e)}")
-            raise
+        from graphiti_core import Graphiti
+        from graphiti_core.llm_client import LLMConfig
+        
+        for attempt in range(self.settings.max_retries):
+            graphiti = None
+            try:
+                # Configure LLM for Gemini
+                llm_config = LLMConfig(
+                    provider="gemini",
+                    model=self.settings.gemini_model,
+                    temperature=self.settings.gemini_temperature,
+                    max_tokens=self.settings.gemini_max_tokens,
+                )
+                
+                # Initialize Graphiti
+                graphiti = Graphiti(
+                    neo4j_uri=self.settings.neo4j_uri,
+                    neo4j_user=self.settings.neo4j_user,
+                    neo4j_password=self.settings.neo4j_password,
+                    llm_config=llm_config
+                )
+                
+                # Build indices
+                await graphiti.build_indices()
+                
+                self._graphiti = graphiti
+                logger.info("graphiti_initialized", llm_provider="gemini")
+                return self._graphiti
+                
+            except Exception as e:
+                # Release the failed attempt's Neo4j driver before retrying
+                if graphiti is not None:
+                    try:
+                        await graphiti.close()
+                    except Exception as close_error:
+                        logger.warning("graphiti_close_failed", error=str(close_error))
+                if attempt == self.settings.max_retries - 1:
+                    logger.exception("graphiti_initialize_failed", error=str(e))
+                    raise
+                logger.warning("graphiti_initialize_retry", attempt=attempt + 1, error=str(e))
+                await asyncio.sleep(min(10, self.settings.retry_delay * (2 ** attempt)))
     
     async def get_graphiti(self):
         """Get or create Graphiti instance"""
@@ -80,43 +106,128 @@ class GraphitiGeminiManager:
             await self.initialize_graphiti()
         return self._graphiti
     
-    async def health_check(self) -> dict:
-        """Perform health check on all services"""
-        health_status = {
-            "graphiti": "unknown",
-            "neo4j": "unknown",
-            "gemini": "unknown"
-        }
+    async def add_episode(self, **kwargs):
+        """Add an episode, bounded by the concurrency semaphore"""
+        async with self._sem:
+            return await self._graphiti.add_episode(**kwargs)
+    
+    async def add_episode_bulk(self, episodes: list[dict]):
+        """Add several episodes in one Graphiti bulk call, bounded by the concurrency semaphore"""
+        from graphiti_core.nodes import EpisodeType
+        from graphiti_core.utils.bulk_utils import RawEpisode
+        
+        raw_episodes = [
+            RawEpisode(
+                name=episode["name"],
+                content=episode["episode_body"],
+                source_description=episode["source_description"] or "",
+                source=EpisodeType.text,
+                reference_time=episode["reference_time"],
+            )
+            for episode in episodes
+        ]
+        
+        async with self._sem:
+            return await self._graphiti.add_episode_bulk(raw_episodes)
+    
+    async def search(self, **kwargs):
+        """Search the graph, bounded by the concurrency semaphore"""
+        async with self._sem:
+            return await self._graphiti.search(**kwargs)
+    
+    async def warmup(self):
+        """Prime the Gemini client and Neo4j connection pool before serving traffic"""
+        try:
+            await self._gemini_model.generate_content_async("warmup")
+        except Exception as e:
+            logger.warning("gemini_warmup_failed", error=str(e))
         
         try:
-            # Check Gemini
-            model = genai.GenerativeModel(self.settings.gemini_model)
-            response = await model.generate_content_async("Hello")
-            health_status["gemini"] = "healthy" if response else "unhealthy"
+            graphiti = await self.get_graphiti()
+            await graphiti.search("warmup", limit=1)
         except Exception as e:
-            logger.error(f"Gemini health check failed: {e}")
-            health_status["gemini"] = "unhealthy"
+            logger.warning("graphiti_warmup_failed", error=str(e))
+    
+    async def close(self):
+        """Close the Graphiti instance and its Neo4j driver"""
+        if self._graphiti is not None:
+            await self._graphiti.close()
+            self._graphiti = None
+    
+    async def health_check(self) -> dict:
+        """Return the deep health status, re-probing at most once per interval"""
+        health_status = self._cached_health()
+        if health_status is not None:
+            return health_status
+        
+        async with self._health_lock:
+            # Another caller may have refreshed the cache while we waited
+            health_status = self._cached_health()
+            if health_status is not None:
+                return health_status
+            
+            health_status = await self._probe_services()
+            self._last_health = (time.monotonic(), health_status)
+            return health_status
+    
+    def _cached_health(self) -> Optional[dict]:
+        """Return the last probe result if it is still within the interval"""
+        if self._last_health is None:
+            return None
+        checked_at, health_status = self._last_health
+        if time.monotonic() - checked_at < self.settings.health_check_interval:
+            return health_status
+        return None
+    
+    async def _probe_services(self) -> dict:
+        """Perform health check on all services"""
+        # The probes are independent, so run them concurrently
+        gemini_status, (graphiti_status, neo4j_status) = await asyncio.gather(
+            self._probe_gemini(),
+            self._probe_graph()
+        )
         
+        return {
+            "graphiti": graphiti_status,
+            "neo4j": neo4j_status,
+            "gemini": gemini_status
+        }
+    
+    async def _probe_gemini(self) -> str:
+        """Check Gemini with a metadata-only call (no token billing)"""
         try:
-            # Check Neo4j and Graphiti
+            # The thread itself cannot be cancelled, but the probe stops waiting on it
+            model = await asyncio.wait_for(
+                asyncio.to_thread(next, iter(_genai.list_models()), None),
+                timeout=self.settings.health_probe_timeout
+            )
+            return "healthy" if model else "unhealthy"
+        except asyncio.TimeoutError:
+            logger.error("gemini_health_check_timeout", timeout=self.settings.health_probe_timeout)
+            return "unhealthy"
+        except Exception as e:
+            logger.exception("gemini_health_check_failed", error=str(e))
+            return "unhealthy"
+    
+    async def _probe_graph(self) -> tuple[str, str]:
+        """Check Neo4j and Graphiti, returning (graphiti, neo4j) statuses"""
+        async def roundtrip():
             graphiti = await self.get_graphiti()
             # Simple query to test connection
             await graphiti.search("health_check", limit=1)
-            health_status["graphiti"] = "healthy"
-            health_status["neo4j"] = "healthy"
-        except Exception as e:
-            logger.error(f"Graphiti/Neo4j health check failed: {e}")
-            health_status["graphiti"] = "unhealthy"
-            health_status["neo4j"] = "unhealthy"
         
-        return health_status
-
-# Global instance
-graphiti_manager: Optional[GraphitiGeminiManager] = None
+        try:
+            await asyncio.wait_for(roundtrip(), timeout=self.settings.health_probe_timeout)
+            return "healthy", "healthy"
+        except asyncio.TimeoutError:
+            logger.error("graphiti_health_check_timeout", timeout=self.settings.health_probe_timeout)
+            return "unhealthy", "unhealthy"
+        except Exception as e:
+            logger.exception("graphiti_health_check_failed", error=str(e))
+            return "unhealthy", "unhealthy"
 
+# Process-wide manager singleton
+@functools.lru_cache(maxsize=1)
 def get_manager() -> GraphitiGeminiManager:
-    global graphiti_manager
-    if graphiti_manager is None:
-        from app.config import settings
-        graphiti_manager = GraphitiGeminiManager(settings)
-    return graphiti_manager
+    from app.config import settings
+    return GraphitiGeminiManager(settings)